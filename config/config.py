@@ -8,6 +8,7 @@ class Config:
     DATA_DIR = PROJECT_ROOT / "data"
     RAW_DATA_DIR = DATA_DIR / "raw"
     PROCESSED_DATA_DIR = DATA_DIR / "processed"
+    SYNTHETIC_CACHE_DIR = PROCESSED_DATA_DIR / "synthetic"
     MODELS_DIR = PROJECT_ROOT / "models"
 
     # Database
@@ -37,5 +38,5 @@ class Config:
     def create_directories(cls):
         """Create necessary directories"""
         for dir_path in [cls.DATA_DIR, cls.RAW_DATA_DIR, 
-                        cls.PROCESSED_DATA_DIR, cls.MODELS_DIR]:
+                        cls.PROCESSED_DATA_DIR, cls.SYNTHETIC_CACHE_DIR, cls.MODELS_DIR]:
             dir_path.mkdir(parents=True, exist_ok=True)
@@ -1,9 +1,15 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Response
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 from typing import List, Optional
+from functools import lru_cache
+import orjson
 import pandas as pd
 import uvicorn
 from datetime import datetime
+from contextlib import asynccontextmanager
+import asyncio
+import logging
 import sys
 import os
 
@@ -11,26 +17,91 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from models.demand_forecasting import DemandForecaster
-from data_generation.synthetic_data import SupplyChainDataGenerator
+from data_generation.synthetic_data import SupplyChainDataGenerator, with_formatted_dimensions
 
-app = FastAPI(
-    title="Supply Chain Optimization Platform API",
-    description="AI-powered supply chain optimization and analytics",
-    version="1.0.0"
-)
+logger = logging.getLogger(__name__)
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+SALES_HISTORY_DAYS = 365
 
 # Global data store
 data_store = {}
-demand_forecaster = DemandForecaster()
+# Set once a fitted forecaster is loaded or trained; None while warming up
+demand_forecaster: Optional[DemandForecaster] = None
+
+@lru_cache(maxsize=512)
+def _forecast_summary(product_ids: tuple, forecast_horizon: int) -> pd.DataFrame:
+    """Memoised forecast summary keyed by sorted product IDs; do not mutate the result"""
+    return demand_forecaster.get_forecast_summary(list(product_ids), forecast_horizon)
+
+def _ordered_forecast_summary(product_ids: tuple, forecast_horizon: int) -> pd.DataFrame:
+    """Forecast summary with rows in request order, served from the sorted-key cache"""
+    summary = _forecast_summary(tuple(sorted(set(product_ids))), forecast_horizon)
+    if summary.empty:
+        return summary
+
+    known_ids = set(summary['product_id'])
+    return (summary.set_index('product_id')
+            .loc[[product_id for product_id in product_ids if product_id in known_ids]]
+            .reset_index())
+
+@lru_cache(maxsize=512)
+def _forecast_records_json(product_ids: tuple, forecast_horizon: int) -> bytes:
+    """Memoised orjson encoding of the forecast records, keyed in request order"""
+    return orjson.dumps(_ordered_forecast_summary(product_ids, forecast_horizon).to_dict('records'),
+                        option=orjson.OPT_SERIALIZE_NUMPY)
+
+def _invalidate_forecast_cache():
+    """Drop memoised forecasts; call whenever the forecaster is replaced or refitted"""
+    _forecast_summary.cache_clear()
+    _forecast_records_json.cache_clear()
+
+def _arrow_stream(df: pd.DataFrame) -> bytes:
+    """Encode a DataFrame as an Arrow IPC stream"""
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+def _train_forecaster(model_path):
+    """Fit, persist and publish the demand forecaster (runs in a worker thread)"""
+    global demand_forecaster
+
+    forecaster = DemandForecaster()
+    forecaster.fit(data_store['sales_data'], data_store['products'])
+
+    # Publish first: a failure to persist must not keep the API warming up forever
+    demand_forecaster = forecaster
+    _invalidate_forecast_cache()
+    print("✅ Demand forecasting models trained")
+
+    try:
+        forecaster.save(model_path)
+        DemandForecaster.prune_models(model_path)
+    except Exception:
+        logger.exception("Could not persist demand forecaster to %s", model_path)
+
+def _log_training_failure(future):
+    """Done-callback surfacing exceptions from background training"""
+    if not future.cancelled() and future.exception() is not None:
+        logger.error("Demand forecaster training failed", exc_info=future.exception())
 
 class ForecastRequest(BaseModel):
     product_ids: List[str]
     forecast_horizon: int = Field(default=30, ge=1, le=365)
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize the application with sample data"""
-    global data_store
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load data before serving and train models in the background
+
+    Data loading is cheap (Parquet cache), so it happens before the port binds.
+    Model training is deferred to a worker thread so /health answers at once;
+    /forecast/demand returns 503 until the forecaster is ready.
+    """
+    global demand_forecaster
 
     # Generate sample data
     generator = SupplyChainDataGenerator()
@@ -39,12 +110,45 @@ async def startup_event():
     data_store['suppliers'] = generator.suppliers
     data_store['warehouses'] = generator.warehouses
     data_store['stores'] = generator.stores
-    data_store['sales_data'] = generator.generate_historical_sales(days=365)
+    data_store['sales_data'] = generator.generate_historical_sales(days=SALES_HISTORY_DAYS)
+
+    # Master data is static, so serialize it once rather than per request
+    app.state.products_json = orjson.dumps(
+        with_formatted_dimensions(data_store['products']).to_dict('records'),
+        option=orjson.OPT_SERIALIZE_NUMPY
+    )
+
+    # Load persisted models, training only when none match this data
+    model_path = DemandForecaster.model_path(
+        generator.dataset_key(SALES_HISTORY_DAYS), data_store['sales_data'], data_store['products']
+    )
+    if model_path.exists():
+        demand_forecaster = DemandForecaster.load(model_path)
+        _invalidate_forecast_cache()
+        print("✅ API initialized with sample data and trained models")
+    else:
+        # run_in_executor rather than asyncio.to_thread keeps Python 3.8 support
+        app.state.training_task = asyncio.get_running_loop().run_in_executor(
+            None, _train_forecaster, model_path
+        )
+        app.state.training_task.add_done_callback(_log_training_failure)
+        print("✅ API initialized with sample data; training models in the background")
 
-    # Train models
-    demand_forecaster.fit(data_store['sales_data'], data_store['products'])
+    yield
 
-    print("✅ API initialized with sample data and trained models")
+    # Let an in-flight training run finish before shutting down; failures are
+    # already logged by the done-callback
+    training_task = getattr(app.state, 'training_task', None)
+    if training_task is not None and not training_task.done():
+        await asyncio.wait([training_task])
+
+app = FastAPI(
+    title="Supply Chain Optimization Platform API",
+    description="AI-powered supply chain optimization and analytics",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
+)
 
 @app.get("/")
 async def root():
@@ -59,7 +163,9 @@ async def root():
 async def health_check():
     return {
         "status": "healthy",
-        "models_loaded": {"demand_forecaster": demand_forecaster.is_fitted},
+        "models_loaded": {
+            "demand_forecaster": demand_forecaster is not None and demand_forecaster.is_fitted
+        },
         "data_loaded": {
             "products": len(data_store.get('products', [])),
             "suppliers": len(data_store.get('suppliers', [])),
@@ -70,22 +176,32 @@ async def health_check():
 @app.get("/products")
 async def get_products():
     """Get all products"""
-    return data_store['products'].to_dict('records')
+    return Response(content=app.state.products_json, media_type="application/json")
 
 @app.post("/forecast/demand")
-async def forecast_demand(request: ForecastRequest):
-    """Generate demand forecast for specified products"""
-    try:
-        forecast_summary = demand_forecaster.get_forecast_summary(
-            request.product_ids, 
-            request.forecast_horizon
-        )
+async def forecast_demand(request: ForecastRequest, accept: Optional[str] = Header(default=None)):
+    """Generate demand forecast for specified products
 
-        return {
-            "forecast_horizon_days": request.forecast_horizon,
-            "products_count": len(request.product_ids),
-            "forecasts": forecast_summary.to_dict('records')
-        }
+    Clients sending ``Accept: application/vnd.apache.arrow.stream`` receive the
+    forecast table as an Arrow IPC stream instead of JSON.
+    """
+    if demand_forecaster is None or not demand_forecaster.is_fitted:
+        raise HTTPException(status_code=503, detail="model warming up")
+
+    try:
+        product_ids = tuple(request.product_ids)
+
+        if accept and ARROW_STREAM_MEDIA_TYPE in accept:
+            forecast_summary = _ordered_forecast_summary(product_ids, request.forecast_horizon)
+            # Encoded eagerly so conversion errors surface as a 500, not a truncated 200
+            return Response(content=_arrow_stream(forecast_summary),
+                            media_type=ARROW_STREAM_MEDIA_TYPE)
+
+        # Splice the cached records into the envelope; the remaining fields are ints
+        forecasts = _forecast_records_json(product_ids, request.forecast_horizon)
+        content = (b'{"forecast_horizon_days":%d,"products_count":%d,"forecasts":%b}'
+                   % (request.forecast_horizon, len(request.product_ids), forecasts))
+        return Response(content=content, media_type="application/json")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1,15 +1,12 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 import sys
 import os
 
 # Add project root to Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from data_generation.synthetic_data import SupplyChainDataGenerator
-from models.demand_forecasting import DemandForecaster
+from data_generation.synthetic_data import SupplyChainDataGenerator, with_formatted_dimensions
 
 # Page configuration
 st.set_page_config(
@@ -18,7 +15,10 @@ st.set_page_config(
     layout="wide"
 )
 
-@st.cache_data
+SALES_HISTORY_DAYS = 365
+
+# Resources are shared, not copied, between reruns; callers must not mutate them
+@st.cache_resource
 def load_sample_data():
     """Load and cache sample data"""
     generator = SupplyChainDataGenerator()
@@ -28,12 +28,42 @@ def load_sample_data():
         'suppliers': generator.suppliers,
         'warehouses': generator.warehouses,
         'stores': generator.stores,
-        'sales_data': generator.generate_historical_sales(days=365),
-        'supplier_performance': generator.generate_supplier_performance()
+        'sales_data': generator.generate_historical_sales(days=SALES_HISTORY_DAYS),
+        'supplier_performance': generator.generate_supplier_performance(),
+        # Computed alongside the sales it names, so it never drifts past midnight
+        'sales_key': generator.sales_cache_key(SALES_HISTORY_DAYS),
+        'dataset_key': generator.dataset_key(SALES_HISTORY_DAYS)
     }
 
     return data, generator
 
+@st.cache_resource
+def get_forecaster(sales_key: str, dataset_key: str, _sales_data: pd.DataFrame,
+                   _products: pd.DataFrame):
+    """Load or train the demand forecaster once per sales dataset
+
+    Only ``sales_key`` is hashed by Streamlit; the underscored DataFrames are
+    skipped so cache lookups never walk the sales table. The model file on
+    disk is still named by the content hash, shared with the API.
+    """
+    from models import DemandForecaster
+
+    return DemandForecaster.load_or_fit(dataset_key, _sales_data, _products)
+
+# The aggregate helpers are keyed on sales_key; the underscored frame is not hashed
+@st.cache_data
+def get_daily_sales(sales_key: str, _sales: pd.DataFrame) -> pd.DataFrame:
+    """Daily sales volume and average price, cached across reruns"""
+    return _sales.groupby('date').agg({
+        'quantity_sold': 'sum',
+        'unit_price': 'mean'
+    }).reset_index()
+
+@st.cache_data
+def get_top_products(sales_key: str, _sales: pd.DataFrame, n: int = 10) -> pd.Series:
+    """Best-selling products by volume, cached across reruns"""
+    return _sales.groupby('product_id', observed=True)['quantity_sold'].sum().nlargest(n)
+
 def main():
     """Main dashboard application"""
 
@@ -52,7 +82,11 @@ def main():
         ["Dashboard Overview", "Demand Forecasting", "Data Explorer"]
     )
 
+    # Plotting and modelling libraries are imported per page, so a rerun
+    # only pays for what the selected page renders
     if page == "Dashboard Overview":
+        import plotly.express as px
+
         st.header("📊 Executive Dashboard")
 
         # Key metrics
@@ -70,10 +104,7 @@ def main():
         # Recent sales trend
         st.subheader("📈 Sales Overview")
         recent_sales = data['sales_data'].tail(1000)
-        daily_sales = recent_sales.groupby('date').agg({
-            'quantity_sold': 'sum',
-            'unit_price': 'mean'
-        }).reset_index()
+        daily_sales = get_daily_sales(data['sales_key'], recent_sales)
 
         fig_sales = px.line(daily_sales, x='date', y='quantity_sold', 
                            title='Daily Sales Volume')
@@ -81,18 +112,20 @@ def main():
 
         # Top products
         st.subheader("🏆 Top Selling Products")
-        top_products = recent_sales.groupby('product_id')['quantity_sold'].sum().nlargest(10)
+        top_products = get_top_products(data['sales_key'], recent_sales, 10)
         fig_top = px.bar(x=top_products.index, y=top_products.values,
                         title='Top 10 Products by Volume')
         st.plotly_chart(fig_top, use_container_width=True)
 
     elif page == "Demand Forecasting":
+        import plotly.express as px
+
         st.header("📈 Demand Forecasting")
 
         # Initialize and train forecaster
         with st.spinner('Training demand forecasting models...'):
-            forecaster = DemandForecaster()
-            forecaster.fit(data['sales_data'], data['products'])
+            forecaster = get_forecaster(data['sales_key'], data['dataset_key'],
+                                        data['sales_data'], data['products'])
 
         # Forecast parameters
         col1, col2 = st.columns(2)
@@ -127,11 +160,13 @@ def main():
                     st.warning("No forecast data available for selected products.")
 
     elif page == "Data Explorer":
+        import plotly.express as px
+
         st.header("🔍 Data Explorer")
 
         # Data overview
         st.subheader("📦 Products")
-        st.dataframe(data['products'].head(10))
+        st.dataframe(with_formatted_dimensions(data['products'].head(10)))
 
         st.subheader("🏪 Suppliers")
         st.dataframe(data['suppliers'].head(10))
@@ -1,24 +1,147 @@
 import pandas as pd
 import numpy as np
-from faker import Faker
-from datetime import datetime, timedelta
-import random
-from typing import Tuple, List, Dict
+from datetime import datetime, timedelta, date
+import argparse
+import hashlib
+import shutil
+import tempfile
+import sys
+import os
+from typing import Tuple, List, Dict, Callable, Optional
 import json
 
-fake = Faker()
-np.random.seed(42)
-random.seed(42)
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from config.config import Config
+
+# Fixed name pools that suppliers and stores draw from by index
+COMPANY_STEMS = [
+    'Anderson', 'Baker', 'Carter', 'Delgado', 'Evans', 'Fischer', 'Garcia', 'Harris',
+    'Ito', 'Jensen', 'Kumar', 'Lopez', 'Morgan', 'Nakamura', 'Olsen', 'Patel',
+    'Quinn', 'Richter', 'Schmidt', 'Wang'
+]
+COMPANY_SUFFIXES = [
+    'Inc', 'LLC', 'Group', 'Ltd', 'and Sons', 'PLC', 'Corp', 'Industries',
+    'Logistics', 'Manufacturing'
+]
+COMPANY_NAMES = np.array([f"{stem} {suffix}" for stem in COMPANY_STEMS
+                          for suffix in COMPANY_SUFFIXES], dtype=object)
+STORE_CITIES = np.array([
+    'Austin', 'Boston', 'Charlotte', 'Columbus', 'Dallas', 'Denver', 'Detroit', 'El Paso',
+    'Fort Worth', 'Fresno', 'Indianapolis', 'Jacksonville', 'Kansas City', 'Las Vegas',
+    'Louisville', 'Memphis', 'Mesa', 'Miami', 'Milwaukee', 'Minneapolis', 'Nashville',
+    'Oakland', 'Oklahoma City', 'Omaha', 'Portland', 'Raleigh', 'Sacramento', 'Seattle',
+    'San Jose', 'Tampa', 'Tucson', 'Tulsa', 'Virginia Beach', 'Washington', 'Wichita',
+    'Albuquerque', 'Atlanta', 'Baltimore', 'Cleveland', 'Colorado Springs'
+], dtype=object)
+
+# Bump when the layout of generated tables changes so stale caches are not reused
+CACHE_VERSION = 5
+
+# Each table draws from its own child stream of the seed, so a table's data
+# never depends on whether another table was generated or read from cache
+TABLE_STREAMS = {
+    'products': 0,
+    'suppliers': 1,
+    'warehouses': 2,
+    'stores': 3,
+    'sales': 4,
+    'supplier_performance': 5
+}
+
+# Arrow-backed strings store free-text columns in contiguous buffers
+STRING_DTYPE = 'string[pyarrow]'
+
+# Low-cardinality columns stored dictionary-encoded in Parquet outputs
+DICTIONARY_COLUMNS = ('product_id', 'store_id', 'supplier_id', 'category', 'country')
+
+def with_formatted_dimensions(products: pd.DataFrame) -> pd.DataFrame:
+    """Replace the dim_l/dim_w/dim_h columns with a display "LxWxH" string column"""
+    dimensions_cm = (products['dim_l'].astype(str) + 'x' + products['dim_w'].astype(str) +
+                     'x' + products['dim_h'].astype(str))
+    # Keep the column where the original schema had it, right after weight_kg
+    formatted = products.copy()
+    formatted.insert(formatted.columns.get_loc('dim_l'), 'dimensions_cm', dimensions_cm)
+    return formatted.drop(columns=['dim_l', 'dim_w', 'dim_h'])
 
 class SupplyChainDataGenerator:
-    def __init__(self):
-        self.products = self._generate_products()
-        self.suppliers = self._generate_suppliers()
-        self.warehouses = self._generate_warehouses()
-        self.stores = self._generate_stores()
+    def __init__(self, seed: int = 42, n_products: int = 50, n_suppliers: int = 15,
+                 n_warehouses: int = 8, n_stores: int = 25, use_cache: bool = True):
+        self.seed = seed
+        self.use_cache = use_cache
+        self.master_key = (CACHE_VERSION, seed, n_products, n_suppliers, n_warehouses, n_stores)
+
+        master_tables = ('products', 'suppliers', 'warehouses', 'stores')
+        if self.use_cache and all(self._cache_path(name, *self.master_key).exists()
+                                  for name in master_tables):
+            for name in master_tables:
+                setattr(self, name, self._read_cache(self._cache_path(name, *self.master_key)))
+        else:
+            self.products = self._generate_products(n_products)
+            self.suppliers = self._generate_suppliers(n_suppliers)
+            self.warehouses = self._generate_warehouses(n_warehouses)
+            self.stores = self._generate_stores(n_stores)
+            if self.use_cache:
+                for name in master_tables:
+                    self._write_cache(getattr(self, name), self._cache_path(name, *self.master_key))
+
+    def _table_rng(self, table: str) -> np.random.Generator:
+        """Independent PCG64 generator for one table, derived from the seed"""
+        return np.random.default_rng([self.seed, TABLE_STREAMS[table]])
+
+    def cache_key(self, *key_parts) -> str:
+        """Short content hash of the inputs that determine a generated table"""
+        return hashlib.sha1("|".join(map(str, key_parts)).encode()).hexdigest()[:12]
+
+    def _cache_path(self, name: str, *key_parts):
+        return Config.SYNTHETIC_CACHE_DIR / f"{name}_{self.cache_key(*key_parts)}.parquet"
+
+    def _read_cache(self, path) -> pd.DataFrame:
+        df = pd.read_parquet(path)
+        # Parquet restores Arrow strings as python-backed strings; convert them back
+        return df.astype({col: STRING_DTYPE for col in df.select_dtypes('string').columns})
+
+    def _write_cache(self, df: pd.DataFrame, path):
+        Config.create_directories()
+        # Write to a uniquely named temporary file first so concurrent readers never
+        # see a partial file and concurrent writers never share one
+        with tempfile.NamedTemporaryFile(dir=path.parent, suffix='.tmp', delete=False) as tmp_file:
+            try:
+                df.to_parquet(tmp_file, compression="zstd", index=False)
+            except BaseException:
+                os.unlink(tmp_file.name)
+                raise
+        os.replace(tmp_file.name, path)
+
+    def _cached(self, name: str, build: Callable[[], pd.DataFrame], *key_parts,
+                stamp: Optional[str] = None) -> pd.DataFrame:
+        """Load a generated table from the Parquet cache, building it on a miss
+
+        ``stamp`` is appended to the file name of tables that go stale (such as
+        sales dated relative to today); files with an older stamp are pruned.
+        """
+        if not self.use_cache:
+            return build()
+
+        path = self._cache_path(name, *self.master_key, *key_parts)
+        stale_prefix = f"{path.stem}_"
+        if stamp:
+            path = path.with_name(f"{stale_prefix}{stamp}.parquet")
+        if path.exists():
+            return self._read_cache(path)
+
+        df = build()
+        self._write_cache(df, path)
+        if stamp:
+            for stale_path in path.parent.glob(f"{stale_prefix}*.parquet"):
+                if stale_path != path:
+                    stale_path.unlink(missing_ok=True)
+        return df
         
     def _generate_products(self, n_products: int = 50) -> pd.DataFrame:
         """Generate product catalog"""
+        rng = self._table_rng('products')
         categories = ['Electronics', 'Clothing', 'Home & Garden', 'Sports', 'Books']
         
         # Fixed product names - simple approach
@@ -35,43 +158,47 @@ class SupplyChainDataGenerator:
             'Gaming Headset', 'Espresso Machine', 'Yoga Block', 'Office Supplies', 'Floor Lamp'
         ]
         
-        products = []
-        for i in range(n_products):
-            products.append({
-                'product_id': f'P{i+1:03d}',
-                'product_name': product_names[i % len(product_names)] + f' Model {i+1}',
-                'category': random.choice(categories),
-                'unit_cost': round(random.uniform(5, 500), 2),
-                'weight_kg': round(random.uniform(0.1, 50), 2),
-                'dimensions_cm': f"{random.randint(5,50)}x{random.randint(5,50)}x{random.randint(5,50)}",
-                'seasonality_factor': random.uniform(0.5, 2.0),
-                'demand_variability': random.uniform(0.1, 0.8)
-            })
+        # Dimensions are kept as numeric columns and only formatted for display
+        dimensions = rng.integers(5, 51, size=(n_products, 3)).astype(np.int16)
         
-        return pd.DataFrame(products)
+        return pd.DataFrame({
+            'product_id': [f'P{i+1:03d}' for i in range(n_products)],
+            'product_name': pd.array([product_names[i % len(product_names)] + f' Model {i+1}'
+                                      for i in range(n_products)], dtype=STRING_DTYPE),
+            'category': pd.Categorical(rng.choice(categories, size=n_products),
+                                       categories=categories),
+            'unit_cost': rng.uniform(5, 500, size=n_products).round(2),
+            'weight_kg': rng.uniform(0.1, 50, size=n_products).round(2),
+            'dim_l': dimensions[:, 0],
+            'dim_w': dimensions[:, 1],
+            'dim_h': dimensions[:, 2],
+            'seasonality_factor': rng.uniform(0.5, 2.0, size=n_products),
+            'demand_variability': rng.uniform(0.1, 0.8, size=n_products)
+        })
     
     def _generate_suppliers(self, n_suppliers: int = 15) -> pd.DataFrame:
         """Generate supplier information"""
+        rng = self._table_rng('suppliers')
         countries = ['USA', 'China', 'Germany', 'Japan', 'India', 'Mexico']
         
-        suppliers = []
-        for i in range(n_suppliers):
-            suppliers.append({
-                'supplier_id': f'S{i+1:03d}',
-                'supplier_name': fake.company(),
-                'country': random.choice(countries),
-                'reliability_score': round(random.uniform(0.7, 0.98), 3),
-                'lead_time_days': random.randint(5, 45),
-                'lead_time_variability': random.uniform(0.1, 0.5),
-                'min_order_quantity': random.randint(50, 1000),
-                'quality_score': round(random.uniform(0.8, 0.99), 3),
-                'payment_terms_days': random.choice([30, 45, 60, 90])
-            })
-        
-        return pd.DataFrame(suppliers)
+        return pd.DataFrame({
+            'supplier_id': [f'S{i+1:03d}' for i in range(n_suppliers)],
+            'supplier_name': pd.array(COMPANY_NAMES[rng.integers(0, len(COMPANY_NAMES),
+                                                                      size=n_suppliers)],
+                                      dtype=STRING_DTYPE),
+            'country': pd.Categorical(rng.choice(countries, size=n_suppliers),
+                                      categories=countries),
+            'reliability_score': rng.uniform(0.7, 0.98, size=n_suppliers).round(3),
+            'lead_time_days': rng.integers(5, 46, size=n_suppliers),
+            'lead_time_variability': rng.uniform(0.1, 0.5, size=n_suppliers),
+            'min_order_quantity': rng.integers(50, 1001, size=n_suppliers),
+            'quality_score': rng.uniform(0.8, 0.99, size=n_suppliers).round(3),
+            'payment_terms_days': rng.choice([30, 45, 60, 90], size=n_suppliers)
+        })
     
     def _generate_warehouses(self, n_warehouses: int = 8) -> pd.DataFrame:
         """Generate warehouse locations"""
+        rng = self._table_rng('warehouses')
         cities = [
             ('New York', 40.7128, -74.0060),
             ('Los Angeles', 34.0522, -118.2437),
@@ -83,120 +210,150 @@ class SupplyChainDataGenerator:
             ('San Diego', 32.7157, -117.1611)
         ]
         
-        warehouses = []
-        for i, (city, lat, lon) in enumerate(cities[:n_warehouses]):
-            warehouses.append({
-                'warehouse_id': f'W{i+1:03d}',
-                'city': city,
-                'latitude': lat,
-                'longitude': lon,
-                'capacity_units': random.randint(10000, 50000),
-                'operating_cost_per_unit': round(random.uniform(0.5, 2.0), 2),
-                'processing_time_hours': random.randint(2, 24)
-            })
+        cities = cities[:n_warehouses]
+        n_warehouses = len(cities)
         
-        return pd.DataFrame(warehouses)
+        return pd.DataFrame({
+            'warehouse_id': [f'W{i+1:03d}' for i in range(n_warehouses)],
+            'city': pd.array([city for city, _, _ in cities], dtype=STRING_DTYPE),
+            'latitude': [lat for _, lat, _ in cities],
+            'longitude': [lon for _, _, lon in cities],
+            'capacity_units': rng.integers(10000, 50001, size=n_warehouses),
+            'operating_cost_per_unit': rng.uniform(0.5, 2.0, size=n_warehouses).round(2),
+            'processing_time_hours': rng.integers(2, 25, size=n_warehouses)
+        })
     
     def _generate_stores(self, n_stores: int = 25) -> pd.DataFrame:
         """Generate retail store locations"""
-        stores = []
-        for i in range(n_stores):
-            stores.append({
-                'store_id': f'ST{i+1:03d}',
-                'store_name': f"{fake.city()} Store",
-                'latitude': round(fake.latitude(), 4),
-                'longitude': round(fake.longitude(), 4),
-                'store_type': random.choice(['Flagship', 'Standard', 'Express']),
-                'square_footage': random.randint(1000, 10000),
-                'customer_traffic_daily': random.randint(100, 2000)
-            })
-        
-        return pd.DataFrame(stores)
+        rng = self._table_rng('stores')
+        store_types = ['Flagship', 'Standard', 'Express']
+        cities = STORE_CITIES[rng.integers(0, len(STORE_CITIES), size=n_stores)]
+
+        return pd.DataFrame({
+            'store_id': [f'ST{i+1:03d}' for i in range(n_stores)],
+            'store_name': pd.array(cities + ' Store', dtype=STRING_DTYPE),
+            'latitude': rng.uniform(-90, 90, size=n_stores).round(4),
+            'longitude': rng.uniform(-180, 180, size=n_stores).round(4),
+            'store_type': pd.Categorical(rng.choice(store_types, size=n_stores),
+                                         categories=store_types),
+            'square_footage': rng.integers(1000, 10001, size=n_stores),
+            'customer_traffic_daily': rng.integers(100, 2001, size=n_stores)
+        })
     
     def generate_historical_sales(self, days: int = 730) -> pd.DataFrame:
         """Generate historical sales data"""
+        days, today = self._sales_key_parts(days)
+        return self._cached('sales', lambda: self._generate_historical_sales(days),
+                            days, stamp=today)
+
+    def _sales_key_parts(self, days: int) -> tuple:
+        # Sales are dated relative to today, so the cache rolls over daily
+        return (days, date.today().isoformat())
+
+    def sales_cache_key(self, days: int = 730) -> str:
+        """Cheap identifier for the sales generate_historical_sales(days) returns"""
+        return self.cache_key(*self.master_key, *self._sales_key_parts(days))
+
+    def dataset_key(self, days: int = 730) -> str:
+        """Identifier for this dataset and history length that, unlike
+        sales_cache_key, does not roll over daily"""
+        return self.cache_key(*self.master_key, days)
+
+    def _generate_historical_sales(self, days: int) -> pd.DataFrame:
+        rng = self._table_rng('sales')
         start_date = datetime.now() - timedelta(days=days)
-        sales_data = []
-        
-        for day in range(days):
-            current_date = start_date + timedelta(days=day)
-            
-            # Weekend and seasonal effects
-            weekend_factor = 1.3 if current_date.weekday() >= 5 else 1.0
-            seasonal_factor = 1 + 0.3 * np.sin(2 * np.pi * day / 365.25)
-            
-            # Generate sales for random subset of products and stores
-            n_transactions = random.randint(50, 200)
-            
-            for _ in range(n_transactions):
-                product = self.products.sample(1).iloc[0]
-                store = self.stores.sample(1).iloc[0]
-                
-                base_demand = random.randint(1, 20)
-                adjusted_demand = int(base_demand * weekend_factor * 
-                                   seasonal_factor * product['seasonality_factor'])
-                
-                # Fixed: Use random.random() instead of random.choice with p parameter
-                promotion_applied = random.random() < 0.15  # 15% chance of promotion
-                
-                sales_data.append({
-                    'date': current_date.date(),
-                    'product_id': product['product_id'],
-                    'store_id': store['store_id'],
-                    'quantity_sold': max(1, adjusted_demand),
-                    'unit_price': round(product['unit_cost'] * random.uniform(1.2, 2.5), 2),
-                    'promotion_applied': promotion_applied
-                })
-        
-        return pd.DataFrame(sales_data)
+        dates = pd.date_range(start_date.date(), periods=days, freq='D')
+
+        # Weekend and seasonal effects, one value per day
+        weekend_factor = np.where(dates.dayofweek >= 5, 1.3, 1.0)
+        seasonal_factor = 1 + 0.3 * np.sin(2 * np.pi * np.arange(days) / 365.25)
+
+        # Generate sales for random subset of products and stores, drawing
+        # every transaction of the whole period in one batch
+        n_transactions = rng.integers(50, 201, size=days)
+        total = n_transactions.sum()
+        day_idx = np.repeat(np.arange(days), n_transactions)
+        product_idx = rng.integers(0, len(self.products), size=total)
+        store_idx = rng.integers(0, len(self.stores), size=total)
+
+        base_demand = rng.integers(1, 21, size=total)
+        seasonality = self.products['seasonality_factor'].to_numpy()[product_idx]
+        adjusted_demand = (base_demand * weekend_factor[day_idx] *
+                           seasonal_factor[day_idx] * seasonality).astype(np.int32)
+        unit_cost = self.products['unit_cost'].to_numpy()[product_idx]
+
+        return pd.DataFrame({
+            'date': dates.date[day_idx],
+            # IDs are dictionary-encoded directly from the drawn indices
+            'product_id': pd.Categorical.from_codes(product_idx, self.products['product_id']),
+            'store_id': pd.Categorical.from_codes(store_idx, self.stores['store_id']),
+            'quantity_sold': np.maximum(1, adjusted_demand),
+            'unit_price': np.round(unit_cost * rng.uniform(1.2, 2.5, size=total), 2),
+            'promotion_applied': rng.random(size=total) < 0.15  # 15% chance of promotion
+        })
     
     def generate_supplier_performance(self, days: int = 365) -> pd.DataFrame:
         """Generate supplier performance history"""
+        rng = self._table_rng('supplier_performance')
         start_date = datetime.now() - timedelta(days=days)
-        performance_data = []
-        
-        for supplier_idx, supplier in self.suppliers.iterrows():
-            # Generate monthly performance records
-            for month in range(0, days, 30):
-                current_date = start_date + timedelta(days=month)
-                
-                base_reliability = supplier['reliability_score']
-                monthly_variation = np.random.normal(0, 0.05)
-                actual_reliability = max(0.5, min(1.0, base_reliability + monthly_variation))
-                
-                performance_data.append({
-                    'date': current_date.date(),
-                    'supplier_id': supplier['supplier_id'],
-                    'on_time_delivery_rate': round(actual_reliability, 3),
-                    'quality_score': round(max(0.7, supplier['quality_score'] + 
-                                             np.random.normal(0, 0.02)), 3),
-                    'lead_time_actual': max(1, int(supplier['lead_time_days'] + 
-                                                 np.random.normal(0, supplier['lead_time_variability'] * 5))),
-                    'orders_fulfilled': random.randint(10, 100),
-                    'total_order_value': round(random.uniform(10000, 500000), 2)
-                })
-        
-        return pd.DataFrame(performance_data)
+
+        # Monthly performance records as a flat (supplier, month) cartesian grid
+        n_suppliers, n_months = len(self.suppliers), len(range(0, days, 30))
+        n_records = n_suppliers * n_months
+        sup_idx = np.repeat(np.arange(n_suppliers), n_months)
+        month_idx = np.tile(np.arange(n_months), n_suppliers)
+
+        reliability = self.suppliers['reliability_score'].to_numpy()[sup_idx]
+        quality = self.suppliers['quality_score'].to_numpy()[sup_idx]
+        lead_time = self.suppliers['lead_time_days'].to_numpy()[sup_idx]
+        lead_time_std = self.suppliers['lead_time_variability'].to_numpy()[sup_idx] * 5
+
+        actual_reliability = np.clip(reliability + rng.normal(0, 0.05, size=n_records), 0.5, 1.0)
+        actual_quality = np.maximum(0.7, quality + rng.normal(0, 0.02, size=n_records))
+        actual_lead_time = np.maximum(1, (lead_time + rng.normal(0, lead_time_std))
+                                      .astype(int))
+
+        dates = pd.Timestamp(start_date.date()) + pd.to_timedelta(month_idx * 30, unit='D')
+
+        return pd.DataFrame({
+            'date': dates.date,
+            'supplier_id': pd.Categorical.from_codes(sup_idx, self.suppliers['supplier_id']),
+            'on_time_delivery_rate': actual_reliability.round(3),
+            'quality_score': actual_quality.round(3),
+            'lead_time_actual': actual_lead_time,
+            'orders_fulfilled': rng.integers(10, 101, size=n_records),
+            'total_order_value': rng.uniform(10000, 500000, size=n_records).round(2)
+        })
     
-    def save_all_data(self, output_dir: str = "data/sample/"):
-        """Save all generated data to files"""
-        import os
+    def save_all_data(self, output_dir: str = "data/sample/", fmt: str = "parquet"):
+        """Save all generated data to files (Parquet with zstd by default, or CSV)"""
+        if fmt not in ("parquet", "csv"):
+            raise ValueError(f"Unsupported output format: {fmt}")
         os.makedirs(output_dir, exist_ok=True)
-        
+
+        def write(df: pd.DataFrame, name: str):
+            if fmt == "csv":
+                df.to_csv(f"{output_dir}/{name}.csv", index=False)
+                return
+            # Categoricals are written by PyArrow as dictionary-encoded columns
+            df = df.astype({col: 'category' for col in DICTIONARY_COLUMNS if col in df.columns})
+            df.to_parquet(f"{output_dir}/{name}.parquet", compression="zstd", index=False)
+
         # Save master data
-        self.products.to_csv(f"{output_dir}/products.csv", index=False)
-        self.suppliers.to_csv(f"{output_dir}/suppliers.csv", index=False)
-        self.warehouses.to_csv(f"{output_dir}/warehouses.csv", index=False)
-        self.stores.to_csv(f"{output_dir}/stores.csv", index=False)
+        # Exported files keep the display dimensions_cm column rather than dim_l/w/h
+        write(with_formatted_dimensions(self.products), "products")
+        write(self.suppliers, "suppliers")
+        write(self.warehouses, "warehouses")
+        write(self.stores, "stores")
         
         # Generate and save transactional data
         print("🔄 Generating historical sales data...")
         sales_data = self.generate_historical_sales()
-        sales_data.to_csv(f"{output_dir}/historical_sales.csv", index=False)
+        write(sales_data, "historical_sales")
         
         print("🔄 Generating supplier performance data...")
         supplier_performance = self.generate_supplier_performance()
-        supplier_performance.to_csv(f"{output_dir}/supplier_performance.csv", index=False)
+        write(supplier_performance, "supplier_performance")
         
         print(f"✅ Generated sample data saved to {output_dir}")
         print(f"📊 Products: {len(self.products)}")
@@ -208,6 +365,16 @@ class SupplyChainDataGenerator:
 
 if __name__ == "__main__":
     print("🚚 Starting Supply Chain Data Generation...")
+    parser = argparse.ArgumentParser(description="Generate synthetic supply chain data")
+    parser.add_argument("--format", choices=["parquet", "csv"], default="parquet",
+                        help="Output file format for the sample data")
+    parser.add_argument("--regen", action="store_true",
+                        help="Delete cached datasets and regenerate from scratch")
+    args = parser.parse_args()
+
+    if args.regen:
+        shutil.rmtree(Config.SYNTHETIC_CACHE_DIR, ignore_errors=True)
+
     generator = SupplyChainDataGenerator()
-    generator.save_all_data()
+    generator.save_all_data(fmt=args.format)
     print("🎉 Data generation complete!")
\ No newline at end of file
@@ -1 +1,9 @@
 # Package initialization
+
+
+def __getattr__(name):
+    # Import the forecasting stack on first access rather than with the package (PEP 562)
+    if name == "DemandForecaster":
+        from .demand_forecasting import DemandForecaster
+        return DemandForecaster
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,76 +1,99 @@
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.metrics import mean_absolute_error, mean_squared_error
-from prophet import Prophet
+import hashlib
+import pickle
+import tempfile
+import sys
+import os
+from pathlib import Path
 import warnings
 warnings.filterwarnings('ignore')
 
+# Add project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from config.config import Config
+
+# Fourier terms used for the weekly and yearly seasonal components
+WEEKLY_FOURIER_ORDER = 3
+YEARLY_FOURIER_ORDER = 4
+MIN_HISTORY_DAYS = 30
+# Yearly seasonality and trend are only identifiable from two full seasons
+MIN_YEARLY_HISTORY_DAYS = 730
+# Ridge penalty on the trend slope, relative to the number of training days
+TREND_PENALTY = 0.1
+
+# Bump when the fitted state or fitting changes so persisted models are not reused
+MODEL_VERSION = 2
+
+
+def forecaster_cache_key(sales_data: pd.DataFrame, products: pd.DataFrame) -> str:
+    """Short content hash of the model version and inputs a fitted forecaster depends on"""
+    digest = hashlib.sha1(f"{MODEL_VERSION}|".encode())
+    digest.update(pd.util.hash_pandas_object(sales_data, index=False).values)
+    digest.update(pd.util.hash_pandas_object(products['product_id'], index=False).values)
+    return digest.hexdigest()[:12]
+
+
 class DemandForecaster:
     def __init__(self):
-        self.prophet_models = {}
+        self.product_index = {}
+        self.coefficients = None
+        self.promotion_effect = None
+        self.promotion_rate = None
+        self.residual_std = None
+        self.start_date = None
+        self.end_date = None
+        self.trend_scale = 1
+        self.yearly_terms = False
         self.rf_models = {}
         self.is_fitted = False
 
     def prepare_data(self, sales_data: pd.DataFrame) -> pd.DataFrame:
         """Prepare sales data for forecasting"""
-        # Convert date column
-        sales_data['date'] = pd.to_datetime(sales_data['date'])
-
-        # Aggregate daily sales by product
-        daily_sales = sales_data.groupby(['date', 'product_id']).agg({
+        # Convert the date key only when needed, without mutating the caller's frame
+        dates = sales_data['date']
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            dates = pd.to_datetime(dates)
+
+        # Aggregate daily sales by product; observed=True keeps a categorical
+        # product_id from expanding to every (date, product) combination
+        daily_sales = sales_data.groupby([dates, 'product_id'], observed=True).agg({
             'quantity_sold': 'sum',
             'unit_price': 'mean',
             'promotion_applied': 'any'
         }).reset_index()
 
-        # Add time-based features
-        daily_sales['day_of_week'] = daily_sales['date'].dt.dayofweek
-        daily_sales['month'] = daily_sales['date'].dt.month
-        daily_sales['quarter'] = daily_sales['date'].dt.quarter
-        daily_sales['is_weekend'] = daily_sales['day_of_week'].isin([5, 6]).astype(int)
+        # Add time-based features; calendar fields fit in int8
+        calendar = daily_sales['date'].dt
+        daily_sales['day_of_week'] = calendar.dayofweek.astype('int8')
+        daily_sales['month'] = calendar.month.astype('int8')
+        daily_sales['quarter'] = calendar.quarter.astype('int8')
+        daily_sales['is_weekend'] = (daily_sales['day_of_week'] >= 5).astype('int8')
 
         return daily_sales
 
-    def create_prophet_features(self, data: pd.DataFrame, product_id: str) -> pd.DataFrame:
-        """Create Prophet-compatible dataset for a specific product"""
-        product_data = data[data['product_id'] == product_id].copy()
-
-        # Prophet requires 'ds' and 'y' columns
-        prophet_data = pd.DataFrame({
-            'ds': product_data['date'],
-            'y': product_data['quantity_sold']
-        })
-
-        # Add regressors
-        prophet_data['promotion'] = product_data['promotion_applied'].astype(int)
-        prophet_data['is_weekend'] = product_data['is_weekend']
+    def _design_matrix(self, dates: pd.DatetimeIndex) -> np.ndarray:
+        """Build the level, weekly and (given enough history) trend and yearly basis
 
-        return prophet_data.sort_values('ds')
+        The weekly harmonics span every day-of-week pattern, weekends included.
+        The trend is held flat past the training window so it is never
+        extrapolated over the forecast horizon.
+        """
+        t = (dates - self.start_date).days.to_numpy(dtype=float)
 
-    def fit_prophet_model(self, data: pd.DataFrame, product_id: str):
-        """Fit Prophet model for a specific product"""
-        prophet_data = self.create_prophet_features(data, product_id)
+        columns = [np.ones_like(t)]
+        seasonal = [(7, WEEKLY_FOURIER_ORDER)]
+        if self.yearly_terms:
+            span = (self.end_date - self.start_date).days
+            columns.append(np.minimum(t, span) / self.trend_scale)
+            seasonal.append((365.25, YEARLY_FOURIER_ORDER))
+        for period, order in seasonal:
+            for k in range(1, order + 1):
+                angle = 2 * np.pi * k * t / period
+                columns.extend([np.sin(angle), np.cos(angle)])
 
-        if len(prophet_data) < 30:  # Need sufficient data
-            return None
-
-        model = Prophet(
-            daily_seasonality=False,
-            weekly_seasonality=True,
-            yearly_seasonality=True,
-            changepoint_prior_scale=0.05
-        )
-
-        # Add regressors
-        model.add_regressor('promotion')
-        model.add_regressor('is_weekend')
-
-        try:
-            model.fit(prophet_data)
-            return model
-        except:
-            return None
+        return np.column_stack(columns)
 
     def fit(self, sales_data: pd.DataFrame, products: pd.DataFrame):
         """Fit forecasting models for all products"""
@@ -78,52 +101,152 @@ class DemandForecaster:
 
         print("🔄 Training demand forecasting models...")
 
-        for product_id in products['product_id'].unique():
-            print(f"   Training models for {product_id}")
-
-            # Fit Prophet model
-            prophet_model = self.fit_prophet_model(prepared_data, product_id)
-            if prophet_model:
-                self.prophet_models[product_id] = prophet_model
+        # Need sufficient data
+        history = prepared_data['product_id'].value_counts()
+        product_ids = [product_id for product_id in products['product_id'].unique()
+                       if history.get(product_id, 0) >= MIN_HISTORY_DAYS]
+
+        dates = pd.date_range(prepared_data['date'].min(), prepared_data['date'].max(), freq='D')
+        self.start_date = dates[0]
+        self.end_date = dates[-1]
+        self.trend_scale = max(len(dates), 1)
+        self.yearly_terms = len(dates) >= MIN_YEARLY_HISTORY_DAYS
+
+        # Dense (days, products) matrices; days without sales had zero demand
+        daily = prepared_data.assign(promotion=prepared_data['promotion_applied'].astype(int))
+        Y = (daily.pivot(index='date', columns='product_id', values='quantity_sold')
+             .reindex(index=dates, columns=product_ids).fillna(0).to_numpy(dtype=float))
+        P = (daily.pivot(index='date', columns='product_id', values='promotion')
+             .reindex(index=dates, columns=product_ids).fillna(0).to_numpy(dtype=float))
+
+        # A single least-squares solve against the shared basis covers every
+        # product; the per-product promotion effect is then recovered from the
+        # residuals (Frisch-Waugh-Lovell) without refactorising the basis.
+        X = self._design_matrix(dates)
+        n_products = len(product_ids)
+        targets = np.hstack([Y, P])
+        if self.yearly_terms:
+            # A zero-target row on the trend column makes the solve a ridge on the slope
+            penalty = np.zeros((1, X.shape[1]))
+            penalty[0, 1] = np.sqrt(TREND_PENALTY * self.trend_scale)
+            X = np.vstack([X, penalty])
+            targets = np.vstack([targets, np.zeros((1, 2 * n_products))])
+        B, *_ = np.linalg.lstsq(X, targets, rcond=None)
+        residuals = targets - X @ B
+        Y_resid, P_resid = residuals[:, :n_products], residuals[:, n_products:]
+
+        promo_var = (P_resid ** 2).sum(axis=0)
+        self.promotion_effect = np.divide((P_resid * Y_resid).sum(axis=0), promo_var,
+                                          out=np.zeros(n_products), where=promo_var > 0)
+        self.promotion_rate = P.mean(axis=0)
+        self.coefficients = B[:, :n_products] - B[:, n_products:] * self.promotion_effect
+        fit_resid = (Y_resid - P_resid * self.promotion_effect)[:len(dates)]
+        self.residual_std = fit_resid.std(axis=0)
+        self.product_index = {product_id: i for i, product_id in enumerate(product_ids)}
 
         self.is_fitted = True
-        print(f"✅ Trained models for {len(self.prophet_models)} products")
+        print(f"✅ Trained models for {len(self.product_index)} products")
+
+    def save(self, path):
+        """Pickle the fitted forecaster to disk"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # A unique temporary file keeps concurrent writers of the same key apart
+        with tempfile.NamedTemporaryFile(dir=path.parent, suffix='.tmp', delete=False) as f:
+            try:
+                pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+            except BaseException:
+                os.unlink(f.name)
+                raise
+        os.replace(f.name, path)
+
+    @classmethod
+    def load(cls, path) -> 'DemandForecaster':
+        """Load a forecaster previously written by save()"""
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+    @staticmethod
+    def model_path(dataset_key: str, sales_data: pd.DataFrame, products: pd.DataFrame) -> Path:
+        """Location of the persisted forecaster for these inputs
+
+        Files are named ``forecaster_<dataset_key>_<last sales date>_<content hash>.pkl``;
+        ``dataset_key`` identifies the data source so pruning leaves other datasets alone.
+        """
+        last_date = pd.Timestamp(sales_data['date'].max()).date().isoformat()
+        key = forecaster_cache_key(sales_data, products)
+        return Config.MODELS_DIR / f"forecaster_{dataset_key}_{last_date}_{key}.pkl"
+
+    @staticmethod
+    def prune_models(keep):
+        """Delete forecasters for the same dataset as ``keep`` fitted on no newer sales
+
+        Sales are dated relative to today, so a new model file appears daily.
+        """
+        keep = Path(keep)
+        dataset_key, last_date, _ = keep.stem[len("forecaster_"):].split("_")
+        for path in Config.MODELS_DIR.glob(f"forecaster_{dataset_key}_*.pkl"):
+            if path != keep and path.stem.split("_")[2] <= last_date:
+                path.unlink(missing_ok=True)
+
+    @classmethod
+    def load_or_fit(cls, dataset_key: str, sales_data: pd.DataFrame,
+                    products: pd.DataFrame) -> 'DemandForecaster':
+        """Load a persisted forecaster for these inputs, fitting and saving one on a miss"""
+        path = cls.model_path(dataset_key, sales_data, products)
+        if path.exists():
+            return cls.load(path)
+
+        forecaster = cls()
+        forecaster.fit(sales_data, products)
+        forecaster.save(path)
+        cls.prune_models(path)
+        return forecaster
+
+    def _future_design_matrix(self, days_ahead: int):
+        """Future dates after the training window and their shared design matrix"""
+        future_dates = pd.date_range(self.end_date + pd.Timedelta(days=1),
+                                     periods=days_ahead, freq='D')
+        return future_dates, self._design_matrix(future_dates)
+
+    def _forecast(self, X_future: np.ndarray, columns) -> np.ndarray:
+        """Forecast the given product columns, assuming each product's historical promotion rate"""
+        return (X_future @ self.coefficients[:, columns] +
+                self.promotion_rate[columns] * self.promotion_effect[columns])
 
     def predict_prophet(self, product_id: str, days_ahead: int = 30) -> pd.DataFrame:
-        """Generate Prophet predictions"""
-        if product_id not in self.prophet_models:
+        """Generate predictions with Prophet-style yhat and uncertainty bounds"""
+        if product_id not in self.product_index:
             return pd.DataFrame()
 
-        model = self.prophet_models[product_id]
-
-        # Create future dataframe
-        future = model.make_future_dataframe(periods=days_ahead)
+        future_dates, X_future = self._future_design_matrix(days_ahead)
 
-        # Add regressor values for future dates
-        future['promotion'] = 0  # Assume no promotions
-        future['is_weekend'] = future['ds'].dt.dayofweek.isin([5, 6]).astype(int)
+        column = self.product_index[product_id]
+        yhat = self._forecast(X_future, column)
+        band = 1.96 * self.residual_std[column]
 
-        forecast = model.predict(future)
-
-        # Return only future predictions
-        return forecast.tail(days_ahead)[['ds', 'yhat', 'yhat_lower', 'yhat_upper']]
+        return pd.DataFrame({
+            'ds': future_dates,
+            'yhat': yhat,
+            'yhat_lower': yhat - band,
+            'yhat_upper': yhat + band
+        })
 
     def get_forecast_summary(self, product_ids: list, days_ahead: int = 30) -> pd.DataFrame:
         """Get forecast summary for multiple products"""
-        summaries = []
-
-        for product_id in product_ids:
-            if product_id in self.prophet_models:
-                prophet_pred = self.predict_prophet(product_id, days_ahead)
-                if not prophet_pred.empty:
-                    avg_demand = prophet_pred['yhat'].mean()
-                    total_demand = prophet_pred['yhat'].sum()
-
-                    summaries.append({
-                        'product_id': product_id,
-                        'avg_daily_demand': round(max(0, avg_demand), 2),
-                        'total_demand_forecast': round(max(0, total_demand), 2),
-                        'forecast_period_days': days_ahead
-                    })
-
-        return pd.DataFrame(summaries)
+        known_ids = [product_id for product_id in product_ids if product_id in self.product_index]
+        if not known_ids:
+            return pd.DataFrame()
+
+        # The future design matrix is identical for every product, so build it
+        # once and forecast all requested products with a single matrix product
+        _, X_future = self._future_design_matrix(days_ahead)
+        columns = [self.product_index[product_id] for product_id in known_ids]
+        yhat = self._forecast(X_future, columns)
+
+        return pd.DataFrame({
+            'product_id': known_ids,
+            'avg_daily_demand': np.maximum(0, yhat.mean(axis=0)).round(2),
+            'total_demand_forecast': np.maximum(0, yhat.sum(axis=0)).round(2),
+            'forecast_period_days': days_ahead
+        })
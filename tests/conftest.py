@@ -0,0 +1,22 @@
+import sys
+import os
+
+import pytest
+
+# Add project root and src to Python path, matching how the app entry points import
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+from config.config import Config
+
+
+@pytest.fixture
+def isolated_dirs(tmp_path, monkeypatch):
+    """Point every Config data/model directory at a temporary location"""
+    monkeypatch.setattr(Config, "DATA_DIR", tmp_path / "data")
+    monkeypatch.setattr(Config, "RAW_DATA_DIR", tmp_path / "data" / "raw")
+    monkeypatch.setattr(Config, "PROCESSED_DATA_DIR", tmp_path / "data" / "processed")
+    monkeypatch.setattr(Config, "SYNTHETIC_CACHE_DIR", tmp_path / "data" / "processed" / "synthetic")
+    monkeypatch.setattr(Config, "MODELS_DIR", tmp_path / "models")
+    return tmp_path
@@ -0,0 +1,142 @@
+import logging
+import threading
+import time
+
+import pyarrow as pa
+import pytest
+from fastapi.testclient import TestClient
+
+from api import main
+from config.config import Config
+from models.demand_forecasting import DemandForecaster
+
+
+def wait_for_forecaster(timeout=30):
+    """Block until background training has published a forecaster"""
+    deadline = time.monotonic() + timeout
+    while main.demand_forecaster is None:
+        assert time.monotonic() < deadline, "forecaster was never published"
+        time.sleep(0.02)
+
+
+@pytest.fixture
+def api(isolated_dirs, monkeypatch):
+    monkeypatch.setattr(main, 'demand_forecaster', None)
+    main._invalidate_forecast_cache()
+    yield main
+    main._invalidate_forecast_cache()
+
+
+@pytest.fixture
+def client(api):
+    with TestClient(api.app) as client:
+        wait_for_forecaster()
+        yield client
+
+
+def test_forecast_returns_503_until_training_finishes(api, monkeypatch):
+    release = threading.Event()
+    original_fit = DemandForecaster.fit
+
+    def blocked_fit(self, *args):
+        release.wait(timeout=30)
+        original_fit(self, *args)
+
+    monkeypatch.setattr(DemandForecaster, 'fit', blocked_fit)
+
+    with TestClient(api.app) as client:
+        assert client.get("/health").json()["models_loaded"]["demand_forecaster"] is False
+        response = client.post("/forecast/demand", json={"product_ids": ["P001"]})
+        assert response.status_code == 503
+
+        release.set()
+        wait_for_forecaster()
+        response = client.post("/forecast/demand", json={"product_ids": ["P001"]})
+        assert response.status_code == 200
+        assert client.get("/health").json()["models_loaded"]["demand_forecaster"] is True
+
+
+def test_training_failure_is_logged(api, monkeypatch, caplog):
+    def failing_fit(self, *args):
+        raise RuntimeError("fit exploded")
+
+    monkeypatch.setattr(DemandForecaster, 'fit', failing_fit)
+    with caplog.at_level(logging.ERROR, logger=api.logger.name):
+        with TestClient(api.app) as client:
+            deadline = time.monotonic() + 30
+            while not api.app.state.training_task.done():
+                assert time.monotonic() < deadline
+                time.sleep(0.02)
+            assert client.post("/forecast/demand", json={"product_ids": ["P001"]}).status_code == 503
+
+    assert "Demand forecaster training failed" in caplog.text
+    assert "fit exploded" in caplog.text
+
+
+def test_startup_loads_persisted_model_without_training(api, monkeypatch):
+    with TestClient(api.app):
+        wait_for_forecaster()
+
+    monkeypatch.setattr(api, 'demand_forecaster', None)
+    monkeypatch.setattr(DemandForecaster, 'fit', lambda *args: pytest.fail("retrained"))
+    with TestClient(api.app) as client:
+        assert client.post("/forecast/demand", json={"product_ids": ["P001"]}).status_code == 200
+
+
+def test_forecasts_follow_request_order(client):
+    product_ids = ["P003", "UNKNOWN", "P001", "P003"]
+    body = client.post("/forecast/demand",
+                       json={"product_ids": product_ids, "forecast_horizon": 14}).json()
+
+    assert body["forecast_horizon_days"] == 14
+    assert body["products_count"] == len(product_ids)
+    assert [row["product_id"] for row in body["forecasts"]] == ["P003", "P001", "P003"]
+
+    # A reordered request for the same products is served from the shared cache
+    reordered = client.post("/forecast/demand", json={"product_ids": ["P001", "P003"]}).json()
+    assert [row["product_id"] for row in reordered["forecasts"]] == ["P001", "P003"]
+
+
+def test_forecast_arrow_payload_decodes(client):
+    response = client.post("/forecast/demand", json={"product_ids": ["P002", "P001"]},
+                           headers={"Accept": main.ARROW_STREAM_MEDIA_TYPE})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == main.ARROW_STREAM_MEDIA_TYPE
+    forecasts = pa.ipc.open_stream(response.content).read_pandas()
+    assert forecasts["product_id"].tolist() == ["P002", "P001"]
+    assert list(forecasts.columns) == ['product_id', 'avg_daily_demand',
+                                       'total_demand_forecast', 'forecast_period_days']
+
+
+def test_train_forecaster_publishes_and_clears_cache(client, api):
+    client.post("/forecast/demand", json={"product_ids": ["P001"]})
+    assert api._forecast_summary.cache_info().currsize == 1
+    previous = api.demand_forecaster
+
+    api._train_forecaster(Config.MODELS_DIR / "forecaster_retrained.pkl")
+
+    assert api.demand_forecaster is not previous
+    assert api._forecast_summary.cache_info().currsize == 0
+    assert api._forecast_records_json.cache_info().currsize == 0
+
+
+def test_train_forecaster_publishes_even_when_save_fails(client, api, monkeypatch, caplog):
+    def failing_save(self, path):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(DemandForecaster, 'save', failing_save)
+    with caplog.at_level(logging.ERROR, logger=api.logger.name):
+        api._train_forecaster(Config.MODELS_DIR / "forecaster_unsaved.pkl")
+
+    assert api.demand_forecaster.is_fitted
+    assert "Could not persist demand forecaster" in caplog.text
+    assert client.post("/forecast/demand", json={"product_ids": ["P001"]}).status_code == 200
+
+
+def test_products_payload(client):
+    products = client.get("/products").json()
+
+    assert len(products) == 50
+    assert list(products[0]).index("dimensions_cm") == list(products[0]).index("weight_kg") + 1
+    assert not {"dim_l", "dim_w", "dim_h"} & set(products[0])
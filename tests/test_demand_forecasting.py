@@ -0,0 +1,160 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_generation.synthetic_data import SupplyChainDataGenerator
+from config.config import Config
+from models.demand_forecasting import DemandForecaster, TREND_PENALTY
+
+
+@pytest.fixture(scope="module")
+def sample_data():
+    generator = SupplyChainDataGenerator(n_products=8, n_stores=5, use_cache=False)
+    return generator.generate_historical_sales(days=180), generator.products
+
+
+@pytest.fixture(scope="module")
+def fitted(sample_data):
+    sales_data, products = sample_data
+    forecaster = DemandForecaster()
+    forecaster.fit(sales_data, products)
+    return forecaster
+
+
+def daily_matrix(sales_data, product_ids, column='quantity_sold'):
+    """Dense (days, products) matrix of daily totals, zero-filled"""
+    dates = pd.to_datetime(sales_data['date'])
+    daily = sales_data.groupby([dates, 'product_id'], observed=True)[column].sum().unstack()
+    full_range = pd.date_range(dates.min(), dates.max(), freq='D')
+    return daily.reindex(index=full_range, columns=product_ids).fillna(0)
+
+
+@pytest.mark.parametrize("days", [180, 760])
+def test_fit_matches_direct_regression_with_promotion(days):
+    generator = SupplyChainDataGenerator(n_products=6, n_stores=5, use_cache=False)
+    sales_data, products = generator.generate_historical_sales(days=days), generator.products
+    forecaster = DemandForecaster()
+    forecaster.fit(sales_data, products)
+    assert forecaster.yearly_terms == (days >= 730)
+
+    product_ids = list(forecaster.product_index)
+    Y = daily_matrix(sales_data, product_ids)
+    P = daily_matrix(sales_data.assign(promotion_applied=sales_data['promotion_applied'].astype(int)),
+                     product_ids, 'promotion_applied').clip(upper=1)
+    X = forecaster._design_matrix(Y.index)
+
+    for product_id, column in forecaster.product_index.items():
+        y, p = Y[product_id].to_numpy(dtype=float), P[product_id].to_numpy(dtype=float)
+
+        # Direct per-product regression with the promotion column in the basis,
+        # plus the same ridge row on the trend when the trend is fitted
+        X_full, y_full = np.column_stack([X, p]), y
+        if forecaster.yearly_terms:
+            penalty = np.zeros((1, X_full.shape[1]))
+            penalty[0, 1] = np.sqrt(TREND_PENALTY * forecaster.trend_scale)
+            X_full, y_full = np.vstack([X_full, penalty]), np.append(y, 0)
+        beta, *_ = np.linalg.lstsq(X_full, y_full, rcond=None)
+
+        fitted_direct = X_full[:len(y)] @ beta
+        fitted_batched = X @ forecaster.coefficients[:, column] + p * forecaster.promotion_effect[column]
+        assert forecaster.promotion_effect[column] == pytest.approx(beta[-1])
+        np.testing.assert_allclose(fitted_batched, fitted_direct, atol=1e-8)
+        assert forecaster.residual_std[column] == pytest.approx((y - fitted_direct).std())
+
+
+def test_design_matrix_is_full_rank(fitted):
+    dates = pd.date_range(fitted.start_date, fitted.end_date, freq='D')
+    X = fitted._design_matrix(dates)
+    assert np.linalg.matrix_rank(X) == X.shape[1]
+
+
+def test_holdout_no_worse_than_flat_mean():
+    generator = SupplyChainDataGenerator(use_cache=False)
+    sales_data = generator.generate_historical_sales(days=730)
+    dates = pd.to_datetime(sales_data['date'])
+    cutoff = dates.min() + pd.Timedelta(days=365)
+    train, test = sales_data[dates < cutoff], sales_data[dates >= cutoff]
+
+    forecaster = DemandForecaster()
+    forecaster.fit(train, generator.products)
+    product_ids = list(forecaster.product_index)
+    history, actual = daily_matrix(train, product_ids), daily_matrix(test, product_ids)
+
+    for horizon in (30, 90, 365):
+        forecast = (forecaster.get_forecast_summary(product_ids, horizon)
+                    .set_index('product_id')['avg_daily_demand'])
+        observed = actual.iloc[:horizon].mean()
+        model_error = ((forecast - observed).abs() / observed).mean()
+        baseline_error = ((history.mean() - observed).abs() / observed).mean()
+
+        assert (forecast > 0).all()
+        assert model_error <= baseline_error + 0.01
+
+
+def test_fit_does_not_mutate_sales(sample_data):
+    sales_data, products = sample_data
+    before = sales_data.copy()
+    DemandForecaster().fit(sales_data, products)
+    assert sales_data.equals(before)
+
+
+def test_prepare_data_accepts_string_and_datetime_dates(sample_data):
+    sales_data, _ = sample_data
+    forecaster = DemandForecaster()
+    from_dates = forecaster.prepare_data(sales_data)
+    from_strings = forecaster.prepare_data(sales_data.assign(date=sales_data['date'].astype(str)))
+
+    assert from_dates.equals(from_strings)
+    assert str(from_dates['day_of_week'].dtype) == 'int8'
+    assert len(from_dates) == len(sales_data.groupby(['date', 'product_id'], observed=True))
+
+
+def test_forecast_summary_shape_and_unknown_ids(fitted):
+    summary = fitted.get_forecast_summary(['P002', 'UNKNOWN', 'P001'], days_ahead=14)
+
+    assert list(summary.columns) == ['product_id', 'avg_daily_demand',
+                                     'total_demand_forecast', 'forecast_period_days']
+    assert summary['product_id'].tolist() == ['P002', 'P001']
+    assert (summary['forecast_period_days'] == 14).all()
+    assert (summary['avg_daily_demand'] >= 0).all()
+    assert fitted.get_forecast_summary(['UNKNOWN']).empty
+
+
+def test_predict_prophet_bounds(fitted):
+    forecast = fitted.predict_prophet('P001', days_ahead=7)
+
+    assert list(forecast.columns) == ['ds', 'yhat', 'yhat_lower', 'yhat_upper']
+    assert len(forecast) == 7
+    assert forecast['ds'].iloc[0] == fitted.end_date + pd.Timedelta(days=1)
+    assert (forecast['yhat_lower'] <= forecast['yhat']).all()
+    assert (forecast['yhat'] <= forecast['yhat_upper']).all()
+    assert fitted.predict_prophet('UNKNOWN').empty
+
+
+def test_load_or_fit_reuses_persisted_model(sample_data, isolated_dirs):
+    sales_data, products = sample_data
+    first = DemandForecaster.load_or_fit('dataset', sales_data, products)
+    path = DemandForecaster.model_path('dataset', sales_data, products)
+    assert path.exists()
+    assert not list(Config.MODELS_DIR.glob("*.tmp"))
+
+    second = DemandForecaster.load_or_fit('dataset', sales_data, products)
+    np.testing.assert_array_equal(first.coefficients, second.coefficients)
+    assert second.product_index == first.product_index
+
+
+def test_prune_models_only_touches_older_models_of_the_same_dataset(sample_data, isolated_dirs):
+    sales_data, products = sample_data
+    Config.MODELS_DIR.mkdir(parents=True)
+    older = Config.MODELS_DIR / "forecaster_dataset_2000-01-01_0123456789ab.pkl"
+    newer = Config.MODELS_DIR / "forecaster_dataset_2999-01-01_0123456789ab.pkl"
+    other_dataset = Config.MODELS_DIR / "forecaster_other_2000-01-01_0123456789ab.pkl"
+    for path in (older, newer, other_dataset):
+        path.touch()
+
+    DemandForecaster.load_or_fit('dataset', sales_data, products)
+
+    assert not older.exists()
+    assert newer.exists()
+    assert other_dataset.exists()
+    assert DemandForecaster.model_path('dataset', sales_data, products).exists()
@@ -0,0 +1,108 @@
+import pandas as pd
+import pytest
+
+from data_generation.synthetic_data import SupplyChainDataGenerator
+from config.config import Config
+
+MASTER_TABLES = ('products', 'suppliers', 'warehouses', 'stores')
+
+
+@pytest.mark.usefixtures("isolated_dirs")
+def test_output_identical_with_cache_off_cold_and_warm():
+    uncached = SupplyChainDataGenerator(use_cache=False)
+    cold = SupplyChainDataGenerator()
+    warm = SupplyChainDataGenerator()
+
+    for name in MASTER_TABLES:
+        assert getattr(uncached, name).equals(getattr(cold, name))
+        assert getattr(cold, name).equals(getattr(warm, name))
+
+    # Transactional tables must not depend on whether master tables were cache hits
+    sales = uncached.generate_historical_sales(days=60)
+    assert sales.equals(cold.generate_historical_sales(days=60))
+    assert sales.equals(warm.generate_historical_sales(days=60))
+
+    assert not list(Config.SYNTHETIC_CACHE_DIR.glob("*.tmp"))
+
+    performance = uncached.generate_supplier_performance()
+    assert performance.equals(cold.generate_supplier_performance())
+    assert performance.equals(warm.generate_supplier_performance())
+
+
+def test_sales_cache_prunes_earlier_days(isolated_dirs):
+    generator = SupplyChainDataGenerator()
+    generator.generate_historical_sales(days=30)
+    current = list(Config.SYNTHETIC_CACHE_DIR.glob("sales_*.parquet"))
+    assert len(current) == 1
+
+    stale = current[0].with_name(current[0].name[:-len("YYYY-MM-DD.parquet")] + "2000-01-01.parquet")
+    current[0].rename(stale)
+    generator.generate_historical_sales(days=30)
+
+    assert not stale.exists()
+    assert len(list(Config.SYNTHETIC_CACHE_DIR.glob("sales_*.parquet"))) == 1
+
+
+
+@pytest.mark.usefixtures("isolated_dirs")
+def test_sales_cache_keeps_other_history_lengths():
+    generator = SupplyChainDataGenerator()
+    generator.generate_historical_sales(days=30)
+    generator.generate_historical_sales(days=60)
+
+    assert len(list(Config.SYNTHETIC_CACHE_DIR.glob("sales_*.parquet"))) == 2
+
+
+def test_same_seed_reproducible_and_different_seeds_differ():
+    first = SupplyChainDataGenerator(seed=1, use_cache=False)
+    again = SupplyChainDataGenerator(seed=1, use_cache=False)
+    other = SupplyChainDataGenerator(seed=2, use_cache=False)
+
+    assert first.generate_historical_sales(days=30).equals(again.generate_historical_sales(days=30))
+    assert not first.products.equals(other.products)
+    assert not first.generate_historical_sales(days=30).equals(other.generate_historical_sales(days=30))
+
+
+EXPORTED_TABLES = ('products', 'suppliers', 'warehouses', 'stores',
+                   'historical_sales', 'supplier_performance')
+
+
+@pytest.fixture(scope="module")
+def small_generator():
+    return SupplyChainDataGenerator(n_products=5, n_suppliers=3, n_warehouses=2, n_stores=4,
+                                    use_cache=False)
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "csv"])
+def test_save_all_data_writes_every_table(small_generator, tmp_path, fmt):
+    small_generator.save_all_data(str(tmp_path), fmt=fmt)
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(
+        f"{name}.{fmt}" for name in EXPORTED_TABLES)
+
+
+def test_save_all_data_parquet_dictionary_encodes_ids(small_generator, tmp_path):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    small_generator.save_all_data(str(tmp_path))
+
+    schema = pq.read_schema(tmp_path / "historical_sales.parquet")
+    assert pa.types.is_dictionary(schema.field('product_id').type)
+    assert pa.types.is_dictionary(schema.field('store_id').type)
+    assert len(pd.read_parquet(tmp_path / "stores.parquet")) == 4
+
+
+def test_save_all_data_rejects_unknown_format(small_generator, tmp_path):
+    with pytest.raises(ValueError):
+        small_generator.save_all_data(str(tmp_path), fmt="xlsx")
+
+
+def test_exported_products_keep_original_column_order(small_generator, tmp_path):
+    small_generator.save_all_data(str(tmp_path))
+
+    products = pd.read_parquet(tmp_path / "products.parquet")
+    assert list(products.columns) == ['product_id', 'product_name', 'category', 'unit_cost',
+                                      'weight_kg', 'dimensions_cm', 'seasonality_factor',
+                                      'demand_variability']
+    assert products['dimensions_cm'].str.fullmatch(r'\d+x\d+x\d+').all()